@@ -8,9 +8,17 @@ bl_info = {
     "category": "Mesh",
 }
 
+import zlib
+
 import bpy
 import bmesh
-from mathutils import Vector
+import numpy as np
+
+# Numba is optional; without it the NumPy code paths are used
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 # ------------------------------------------------------------
 # Data container for a single threshold range
@@ -125,6 +133,23 @@ class LS_OT_move_range(bpy.types.Operator):
 # ------------------------------------------------------------
 # Tutorial popup operator
 # ------------------------------------------------------------
+# Empty strings are drawn as separators
+_TUTORIAL_LINES = (
+    "Volume Select — Quick Tutorial",
+    "",
+    "1) Select a mesh object and enter Edit Mode (Tab).",
+    "2) Choose the element type in the top of the sidebar: Vert/Edge/Face.",
+    "3) Create ranges with 'Add Range'. Use toggles to enable Min/Max.",
+    "   - If Min is disabled, the range starts from 0.",
+    "   - If Max is disabled, the range is open-ended upward.",
+    "4) Reorder ranges by selecting them and pressing the up/down arrows or drag.",
+    "5) Press 'Select by Threshold Ranges' to apply selection.",
+    "",
+    "Notes:",
+    "- Volumes are bounding-box volumes in scene units^3 (world-space).",
+    "- Use large Max values for big scenes (sliders allow large numbers).",
+)
+
 class LS_OT_show_tutorial(bpy.types.Operator):
     bl_idname = "ls.show_tutorial"
     bl_label = "Show Tutorial"
@@ -135,23 +160,201 @@ class LS_OT_show_tutorial(bpy.types.Operator):
 
     def draw(self, context):
         layout = self.layout
-        layout.label(text="Volume Select — Quick Tutorial")
-        layout.separator()
-        layout.label(text="1) Select a mesh object and enter Edit Mode (Tab).")
-        layout.label(text="2) Choose the element type in the top of the sidebar: Vert/Edge/Face.")
-        layout.label(text="3) Create ranges with 'Add Range'. Use toggles to enable Min/Max.")
-        layout.label(text="   - If Min is disabled, the range starts from 0.")
-        layout.label(text="   - If Max is disabled, the range is open-ended upward.")
-        layout.label(text="4) Reorder ranges by selecting them and pressing the up/down arrows or drag.")
-        layout.label(text="5) Press 'Select by Threshold Ranges' to apply selection.")
-        layout.separator()
-        layout.label(text="Notes:")
-        layout.label(text="- Volumes are bounding-box volumes in scene units^3 (world-space).")
-        layout.label(text="- Use large Max values for big scenes (sliders allow large numbers).")
+        for line in _TUTORIAL_LINES:
+            if line:
+                layout.label(text=line)
+            else:
+                layout.separator()
 
     def execute(self, context):
         return {'FINISHED'}
 
+# ------------------------------------------------------------
+# Helpers: connected components and per-component volumes
+# ------------------------------------------------------------
+if njit is not None:
+    @njit(cache=True)
+    def _nb_bfs_labels(indptr, indices, nverts):
+        # A vertex is visited once it has a label, so no separate mask is kept
+        labels = np.full(nverts, -1, dtype=np.int32)
+        queue = np.empty(nverts, dtype=np.int32)
+        ncomp = 0
+        for seed in range(nverts):
+            if labels[seed] >= 0:
+                continue
+            labels[seed] = ncomp
+            queue[0] = seed
+            head, tail = 0, 1
+            while head < tail:
+                v = queue[head]
+                head += 1
+                for k in range(indptr[v], indptr[v + 1]):
+                    u = indices[k]
+                    if labels[u] < 0:
+                        labels[u] = ncomp
+                        queue[tail] = u
+                        tail += 1
+            ncomp += 1
+        return labels, ncomp
+
+    @njit(cache=True, parallel=True)
+    def _nb_aabb_volumes(coords, starts, ends):
+        # Components are contiguous row blocks of coords, reduced independently
+        vols = np.empty(starts.shape[0])
+        for c in prange(starts.shape[0]):
+            s = starts[c]
+            x0 = x1 = coords[s, 0]
+            y0 = y1 = coords[s, 1]
+            z0 = z1 = coords[s, 2]
+            for i in range(s + 1, ends[c]):
+                x, y, z = coords[i, 0], coords[i, 1], coords[i, 2]
+                x0, x1 = min(x0, x), max(x1, x)
+                y0, y1 = min(y0, y), max(y1, y)
+                z0, z1 = min(z0, z), max(z1, z)
+            vols[c] = abs(np.float64(x1 - x0) * np.float64(y1 - y0) * np.float64(z1 - z0))
+        return vols
+
+def _csr_adjacency(edges, nverts):
+    """Vertex adjacency of an (nedges, 2) edge array as CSR (indptr, indices)"""
+    ends = edges.ravel()
+    indptr = np.zeros(nverts + 1, dtype=np.int32)
+    np.cumsum(np.bincount(ends, minlength=nverts), out=indptr[1:])
+    # Slot k of the flat edge array is joined to its partner slot k ^ 1
+    order = np.argsort(ends, kind='stable')
+    indices = ends[order ^ 1]
+    return indptr, indices
+
+def _label_components(edges, nverts):
+    """Connected-component label of each vertex; returns (labels, count)"""
+    if njit is not None:
+        indptr, indices = _csr_adjacency(edges, nverts)
+        return _nb_bfs_labels(indptr, indices, nverts)
+
+    # Vectorized hook-and-jump: each vertex points at a smaller-or-equal
+    # index in its component, and roots point at themselves
+    parent = np.arange(nverts, dtype=np.int32)
+    a, b = edges[:, 0], edges[:, 1]
+    while True:
+        ra, rb = parent[a], parent[b]
+        split = ra != rb
+        if not split.any():
+            break
+        # Hook the larger root of every edge that still spans two trees
+        ra, rb = ra[split], rb[split]
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+        # Pointer jumping until every vertex points directly at its root
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+    roots, labels = np.unique(parent, return_inverse=True)
+    return labels.astype(np.int32), len(roots)
+
+def _component_volumes(coords, labels, ncomp):
+    """Absolute bounding-box volume of each labelled component"""
+    if ncomp == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    # Sort vertices by label so each component is one contiguous block
+    order = np.argsort(labels, kind='stable')
+    sorted_coords = coords[order]
+    starts = np.searchsorted(labels[order], np.arange(ncomp))
+    if njit is not None:
+        ends = np.append(starts[1:], len(labels))
+        return _nb_aabb_volumes(sorted_coords, starts, ends)
+
+    mins = np.minimum.reduceat(sorted_coords, starts)
+    maxs = np.maximum.reduceat(sorted_coords, starts)
+    # Multiply in float64, like the Numba kernel
+    return np.abs(np.prod((maxs - mins).astype(np.float64), axis=1))
+
+# ------------------------------------------------------------
+# Helpers: range matching
+# ------------------------------------------------------------
+def _read_ranges(scn):
+    """(lo, hi) bounds of every range; a disabled bound is open-ended"""
+    # One foreach_get per property reads the whole collection in C
+    n = len(scn.ls_ranges)
+    mins, maxs = np.empty(n, dtype=np.float32), np.empty(n, dtype=np.float32)
+    use_min, use_max = np.empty(n, dtype=bool), np.empty(n, dtype=bool)
+    scn.ls_ranges.foreach_get("min_value", mins)
+    scn.ls_ranges.foreach_get("max_value", maxs)
+    scn.ls_ranges.foreach_get("use_min", use_min)
+    scn.ls_ranges.foreach_get("use_max", use_max)
+    lo = np.where(use_min, mins.astype(np.float64), -np.inf)
+    hi = np.where(use_max, maxs.astype(np.float64), np.inf)
+    return lo, hi
+
+def _merge_intervals(lo, hi):
+    """Union of closed intervals [lo, hi] as sorted, disjoint (los, his) arrays"""
+    keep = lo <= hi
+    order = np.argsort(lo[keep], kind='stable')
+    los, his = [], []
+    for a, b in zip(lo[keep][order].tolist(), hi[keep][order].tolist()):
+        if his and a <= his[-1]:
+            his[-1] = max(his[-1], b)
+        else:
+            los.append(a)
+            his.append(b)
+    return np.array(los, dtype=np.float64), np.array(his, dtype=np.float64)
+
+def _match_intervals(values, los, his):
+    """Boolean mask of values lying in any of the disjoint sorted intervals"""
+    if len(los) == 0:
+        return np.zeros(len(values), dtype=bool)
+    # First interval whose upper bound is not below the value
+    idx = np.searchsorted(his, values, side='left')
+    found = idx < len(los)
+    return found & (values >= los[np.minimum(idx, len(los) - 1)])
+
+# ------------------------------------------------------------
+# Scratch buffers for foreach_get/foreach_set transfers, reused across runs. Buffers
+# larger than the cap are allocated per call and not kept, so a single
+# huge mesh does not pin its memory for the rest of the session.
+# ------------------------------------------------------------
+_SCRATCH_MAX_BYTES = 8 << 20
+_scratch_buffers = {}
+
+def _scratch(name, size, dtype):
+    """Return a length-size view of the named module-level buffer"""
+    buf = _scratch_buffers.get(name)
+    if buf is not None and buf.dtype == dtype and len(buf) >= size:
+        return buf[:size]
+    buf = np.empty(size, dtype=dtype)
+    if buf.nbytes <= _SCRATCH_MAX_BYTES:
+        _scratch_buffers[name] = buf
+    return buf
+
+def _edit_coords_source(obj):
+    """Collection holding the edited coordinates after update_from_editmode"""
+    # With shape keys the mesh vertices hold the basis positions, while the
+    # active key holds what Edit Mode shows
+    key = obj.active_shape_key
+    return key.data if key is not None else obj.data.vertices
+
+def _reload_edit_bmesh(obj, bm, mesh_select_mode):
+    """Edit Mode draws from its own bmesh, so reload it from the updated mesh"""
+    mesh = obj.data
+    # bm.clear() resets the select mode and empties the select history; the
+    # mode is restored below, but the active element is dropped
+    select_mode = bm.select_mode
+    bm.clear()
+    if mesh.shape_keys is not None:
+        # Keep editing the active shape key rather than the basis
+        bm.from_mesh(mesh, use_shape_key=True, shape_key_index=obj.active_shape_key_index)
+    else:
+        bm.from_mesh(mesh)
+    if not select_mode:
+        select_mode = {name for name, used in zip(('VERT', 'EDGE', 'FACE'), mesh_select_mode)
+                       if used}
+    bm.select_mode = select_mode
+    bmesh.update_edit_mesh(mesh)
+
+# Hidden mesh properties holding the cached labels and volumes
+_CACHE_PROPS = ("_ls_topo", "_ls_labels", "_ls_ncomp", "_ls_geom", "_ls_volumes")
+
 # ------------------------------------------------------------
 # Main operator: perform selection
 # ------------------------------------------------------------
@@ -170,86 +373,120 @@ class LS_OT_select_by_ranges(bpy.types.Operator):
         obj = context.object
         mesh = obj.data
 
-        # Build list of ranges
-        ranges = []
-        for item in scn.ls_ranges:
-            vmin = item.min_value if item.use_min else None
-            vmax = item.max_value if item.use_max else None
-            ranges.append((vmin, vmax))
+        # Read all ranges and merge them into disjoint sorted intervals
+        los, his = _merge_intervals(*_read_ranges(scn))
 
-        # Operate in bmesh
+        # Edit bmesh, only reloaded after the mesh-side selection write; it is
+        # never indexed, so no lookup tables are built
         bm = bmesh.from_edit_mesh(mesh)
-        bm.verts.ensure_lookup_table()
-        bm.edges.ensure_lookup_table()
-        bm.faces.ensure_lookup_table()
 
         # Selection mode from toolbar
         use_verts, use_edges, use_faces = context.tool_settings.mesh_select_mode
-
-        # Find connected components
-        unvisited = set(bm.verts)
-        parts = []
-        while unvisited:
-            seed = unvisited.pop()
-            stack = [seed]
-            comp = {seed}
-            while stack:
-                v = stack.pop()
-                for e in v.link_edges:
-                    u = e.other_vert(v)
-                    if u in unvisited:
-                        unvisited.remove(u)
-                        comp.add(u)
-                        stack.append(u)
-            parts.append(comp)
-
-        # Compute world-space bounding-box volumes
-        volumes = []
-        for comp in parts:
-            world_coords = [obj.matrix_world @ v.co for v in comp]
-            min_c = Vector((min(c.x for c in world_coords),
-                            min(c.y for c in world_coords),
-                            min(c.z for c in world_coords)))
-            max_c = Vector((max(c.x for c in world_coords),
-                            max(c.y for c in world_coords),
-                            max(c.z for c in world_coords)))
-            size = max_c - min_c
-            volumes.append(abs(size.x * size.y * size.z))
-
-        # Clear selection
-        if use_verts:
-            for v in bm.verts: v.select = False
-        if use_edges:
-            for e in bm.edges: e.select = False
+        # Selecting an edge or face also selects the elements below it, so
+        # those masks are written too to keep the selection flushed
+        write_verts = use_verts or use_edges or use_faces
+        write_edges = use_edges or use_faces
+
+        # Sync edit-mode data to the mesh so it can be read with foreach_get
+        obj.update_from_editmode()
+
+        # Fast path: when the intervals accept no volume or every volume
+        # (volumes are never negative), no component search is needed
+        if len(los) == 0 or (los[0] <= 0.0 and his[0] == np.inf):
+            select = len(los) > 0
+            for elems, wanted in ((mesh.vertices, write_verts),
+                                  (mesh.edges, write_edges),
+                                  (mesh.polygons, use_faces)):
+                if wanted:
+                    mask = _scratch("uniform", len(elems), np.bool_)
+                    mask.fill(select)
+                    elems.foreach_set("select", mask)
+            _reload_edit_bmesh(obj, bm, context.tool_settings.mesh_select_mode)
+            return {'FINISHED'}
+
+        # Vertex coordinates as a flat float32 buffer
+        nverts = len(mesh.vertices)
+        coords = _scratch("coords", nverts * 3, np.float32)
+        _edit_coords_source(obj).foreach_get("co", coords)
+        coords = coords.reshape(-1, 3)
+
+        # Edge endpoints as an (nedges, 2) int32 array
+        nedges = len(mesh.edges)
+        edges = _scratch("edges", nedges * 2, np.int32)
+        mesh.edges.foreach_get("vertices", edges)
+        edges = edges.reshape(-1, 2)
+
+        # World matrix read once into a float32 array; only the linear part
+        # matters, since bounding-box extents are translation-invariant
+        M = np.asarray(obj.matrix_world, dtype=np.float32)
+        R = M[:3, :3]
+
+        # Labels and volumes are cached on the mesh as hidden custom properties,
+        # so they persist with the file. Labels are reused while the topology
+        # is unchanged, volumes while the coordinates and world matrix are too;
+        # the keys are checksums of the raw buffers.
+        topo_key = "%d:%d:%08x" % (nverts, nedges, zlib.crc32(edges))
+        geom_key = "%s:%08x:%s" % (topo_key, zlib.crc32(coords), R.tobytes().hex())
+
+        # Find connected components, labelling each vertex with its component index
+        labels_blob, ncomp = mesh.get("_ls_labels"), mesh.get("_ls_ncomp")
+        if (mesh.get("_ls_topo") == topo_key and isinstance(labels_blob, bytes)
+                and len(labels_blob) == 4 * nverts and isinstance(ncomp, int)):
+            labels = np.frombuffer(labels_blob, dtype=np.int32)
+        else:
+            labels, ncomp = _label_components(edges, nverts)
+            mesh["_ls_topo"] = topo_key
+            mesh["_ls_labels"] = labels.tobytes()
+            mesh["_ls_ncomp"] = ncomp
+
+        # Compute world-space bounding-box volumes, one reduction per component.
+        # An axis-aligned scale maps local boxes to world boxes, so the volume
+        # just scales by the determinant; anything else needs the transform.
+        volumes_blob = mesh.get("_ls_volumes")
+        if (mesh.get("_ls_geom") == geom_key and isinstance(volumes_blob, bytes)
+                and len(volumes_blob) == 8 * ncomp):
+            volumes = np.frombuffer(volumes_blob, dtype=np.float64)
+        else:
+            if np.allclose(R - np.diag(np.diag(R)), 0.0):
+                volumes = _component_volumes(coords, labels, ncomp)
+                volumes *= abs(float(R[0, 0] * R[1, 1] * R[2, 2]))
+            else:
+                volumes = _component_volumes(coords @ R.T, labels, ncomp)
+            mesh["_ls_geom"] = geom_key
+            mesh["_ls_volumes"] = np.asarray(volumes, dtype=np.float64).tobytes()
+
+        # Flag components matching any range, locating every volume among
+        # the merged intervals with one binary search
+        accept = _match_intervals(volumes, los, his)
+
+        # Write the selection of every element in one C call per element type,
+        # replacing any previous state; connected elements share their first
+        # vertex's component
+        if write_verts:
+            mesh.vertices.foreach_set("select", accept[labels])
+        if write_edges:
+            mesh.edges.foreach_set("select", accept[labels[edges[:, 0]]])
         if use_faces:
-            for f in bm.faces: f.select = False
-
-        # Select components matching ranges
-        for comp, vol in zip(parts, volumes):
-            matched = False
-            for vmin, vmax in ranges:
-                if vmin is not None and vol < vmin:
-                    continue
-                if vmax is not None and vol > vmax:
-                    continue
-                matched = True
-                break
-            if not matched:
-                continue
+            loop_start = _scratch("loop_start", len(mesh.polygons), np.int32)
+            mesh.polygons.foreach_get("loop_start", loop_start)
+            loop_verts = _scratch("loop_verts", len(mesh.loops), np.int32)
+            mesh.loops.foreach_get("vertex_index", loop_verts)
+            mesh.polygons.foreach_set("select", accept[labels[loop_verts[loop_start]]])
 
-            if use_verts:
-                for v in comp: v.select = True
-            if use_edges:
-                for v in comp:
-                    for e in v.link_edges:
-                        if e.verts[0] in comp and e.verts[1] in comp:
-                            e.select = True
-            if use_faces:
-                for f in bm.faces:
-                    if all(v in comp for v in f.verts):
-                        f.select = True
-
-        bmesh.update_edit_mesh(mesh)
+        _reload_edit_bmesh(obj, bm, context.tool_settings.mesh_select_mode)
+        return {'FINISHED'}
+
+class LS_OT_clear_cache(bpy.types.Operator):
+    bl_idname = "ls.clear_cache"
+    bl_label = "Clear Cached Volumes"
+    bl_description = "Remove the component labels and volumes cached on every mesh in the file"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        for mesh in bpy.data.meshes:
+            for key in _CACHE_PROPS:
+                if key in mesh:
+                    del mesh[key]
         return {'FINISHED'}
 
 # ------------------------------------------------------------
@@ -304,6 +541,7 @@ class LS_PT_panel(bpy.types.Panel):
         row = layout.row()
         row.operator('ls.show_tutorial', icon='HELP')
         row.operator('ls.select_by_ranges', icon='VIEWZOOM')
+        layout.operator('ls.clear_cache', icon='TRASH')
 
 # ------------------------------------------------------------
 # Registration
@@ -316,6 +554,7 @@ classes = [
     LS_OT_move_range,
     LS_OT_show_tutorial,
     LS_OT_select_by_ranges,
+    LS_OT_clear_cache,
     LS_PT_panel,
 ]
 
@@ -332,6 +571,7 @@ def unregister():
         bpy.utils.unregister_class(c)
     del bpy.types.Scene.ls_ranges
     del bpy.types.Scene.ls_ranges_index
+    _scratch_buffers.clear()
 
 if __name__ == "__main__":
     register()